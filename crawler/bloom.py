@@ -0,0 +1,94 @@
+# File: crawler/bloom.py
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter for URL membership checks
+
+    Stores ~capacity strings in a bit array instead of keeping the strings
+    themselves. Lookups may return false positives at roughly error_rate,
+    but never false negatives.
+    """
+
+    def __init__(self, capacity=100000, error_rate=1e-4):
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        # Optimal bit count and hash count for the requested capacity/error rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        """Derive the bit positions for a key by double hashing one digest"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        """Add a key; returns True if it was (probably) already present"""
+        bits = self.bits
+        present = True
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                present = False
+                bits[pos >> 3] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def __len__(self):
+        return self.count
+
+
+class ScalableBloomFilter:
+    """Bloom filter that grows by chaining larger filters as it fills up
+
+    Each new filter has `growth` times the capacity of the previous one and
+    a tighter error rate, so the overall false-positive rate stays below
+    error_rate no matter how many URLs are added.
+    """
+
+    def __init__(self, initial_capacity=100000, error_rate=1e-3, growth=4, tightening=0.5):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.filters = []
+        self._add_filter()
+
+    def _add_filter(self):
+        # Error rates form a geometric series summing to at most error_rate
+        n = len(self.filters)
+        self.filters.append(BloomFilter(
+            capacity=self.initial_capacity * self.growth ** n,
+            error_rate=self.error_rate * (1 - self.tightening) * self.tightening ** n
+        ))
+
+    def add(self, key):
+        """Add a key; returns True if it was (probably) already present"""
+        if key in self:
+            return True
+        current = self.filters[-1]
+        if current.count >= current.capacity:
+            self._add_filter()
+            current = self.filters[-1]
+        current.add(key)
+        return False
+
+    def __contains__(self, key):
+        # Newest filters hold the most keys, so check them first
+        return any(key in bloom for bloom in reversed(self.filters))
+
+    def __len__(self):
+        return sum(bloom.count for bloom in self.filters)
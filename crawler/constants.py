@@ -0,0 +1,106 @@
+# File: crawler/constants.py
+
+# Shared by PoliceSpider (documents are recorded, not followed) and
+# TextContentSpider (documents are skipped)
+
+# File extensions to exclude (images, scripts, styles)
+EXCLUDED_EXTENSIONS = frozenset({
+    # Images
+    'jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp', 'svg', 'ico',
+    # Scripts and styles
+    'js', 'css',
+    # Other assets we might want to skip
+    'woff', 'woff2', 'ttf', 'eot', 'otf'
+})
+
+# File extensions of documents (not HTML pages)
+DOCUMENT_EXTENSIONS = frozenset({
+    'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx',
+    'txt', 'csv', 'xml', 'json', 'zip', 'rar', 'tar', 'gz'
+})
+
+# CSS selectors for elements to exclude from extracted text (headers, footers, navigation, etc.)
+EXCLUDED_SELECTORS = (
+    # Semantic HTML5 tags
+    'header',
+    'footer',
+    'nav',
+    'aside',
+
+    # Common class patterns
+    '.header',
+    '.footer',
+    '.navigation',
+    '.nav',
+    '.navbar',
+    '.sidebar',
+    '.breadcrumb',
+    '.breadcrumbs',
+    '.menu',
+    '.main-menu',
+    '.top-menu',
+    '.bottom-menu',
+    '.copyright',
+    '.social',
+    '.social-media',
+    '.social-links',
+
+    # Common ID patterns
+    '#header',
+    '#footer',
+    '#navigation',
+    '#nav',
+    '#navbar',
+    '#sidebar',
+    '#menu',
+    '#top-menu',
+    '#bottom-menu',
+
+    # Skip/advertisement areas
+    '.skip',
+    '.skip-link',
+    '.skip-content',
+    '.advertisement',
+    '.ads',
+    '.ad-banner',
+    '.banner',
+    '.promo',
+    '.popup',
+    '.modal',
+    '.overlay',
+
+    # Cookie/privacy notices
+    '.cookie-notice',
+    '.cookie-banner',
+    '.privacy-notice',
+    '.gdpr-notice',
+
+    # Search and login areas (often in headers)
+    '.search',
+    '.search-form',
+    '.search-box',
+    '.login',
+    '.login-form',
+    '.user-menu',
+
+    # Language/accessibility controls
+    '.language-selector',
+    '.lang-selector',
+    '.accessibility-controls',
+    '.text-size-controls',
+
+    # Social sharing (often in footers)
+    '.share',
+    '.sharing',
+    '.social-share',
+
+    # Back to top links
+    '.back-to-top',
+    '.scroll-to-top',
+
+    # Print/email controls
+    '.print',
+    '.email',
+    '.print-page',
+    '.email-page',
+)
@@ -1,13 +1,28 @@
 # File: kerala_police_crawler/items.py
 
+from dataclasses import dataclass
+
 import scrapy
 
-class UrlItem(scrapy.Item):
+# One UrlItem per crawled page: slots avoid a per-instance dict
+@dataclass(slots=True)
+class UrlItem:
+    url: str
+    status_code: object
+    content_type: str
+    title: str
+    depth: int
+
+class ContentItem(scrapy.Item):
     url = scrapy.Field()
-    status_code = scrapy.Field()
-    content_type = scrapy.Field()
     title = scrapy.Field()
-    depth = scrapy.Field()
+    text_content = scrapy.Field()
+    content_type = scrapy.Field()
+    error = scrapy.Field()
+    status_code = scrapy.Field()
+    word_count = scrapy.Field()
+    excluded_elements_count = scrapy.Field()
+    extracted_at = scrapy.Field()
 
 
 
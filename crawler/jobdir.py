@@ -0,0 +1,11 @@
+# File: crawler/jobdir.py
+
+import os
+
+from scrapy.utils.job import job_dir
+
+
+def is_resuming(settings):
+    """Check if JOBDIR is set and holds the spider state of an earlier run"""
+    path = job_dir(settings)
+    return bool(path) and os.path.exists(os.path.join(path, 'spider.state'))
@@ -0,0 +1,123 @@
+# File: crawler/linkfilter.py
+
+import re
+from functools import lru_cache
+from urllib.parse import urljoin
+
+from w3lib.url import canonicalize_url
+
+# RFC 3986 appendix B: scheme, authority, path and query; the fragment is matched but not captured
+_URL_RE = re.compile(r'^(?:([^:/?#]+):)?(?://([^/?#]*))?([^?#]*)(?:\?([^#]*))?(?:#.*)?$', re.DOTALL)
+
+# Trailing extension of a URL path (the path never includes the query or fragment)
+_EXT_RE = re.compile(r'\.([a-z0-9]{1,5})$', re.IGNORECASE)
+
+def path_extension(path):
+    """Return the lowercased extension of a URL path, or '' if it has none"""
+    m = _EXT_RE.search(path)
+    return m.group(1).lower() if m else ''
+
+def fast_join(base_url, base_origin, href):
+    """urljoin with fast paths for absolute, protocol-relative and root-relative links
+    
+    base_origin is the scheme://netloc prefix of base_url.
+    """
+    if href.startswith(('https://', 'http://')):
+        return href
+    if href.startswith('//'):
+        return base_origin.partition(':')[0] + ':' + href
+    if href.startswith('/'):
+        return base_origin + href
+    # Page-relative, query-only and other links need full RFC 3986 resolution
+    return urljoin(base_url, href)
+
+@lru_cache(maxsize=131072)
+def classify_url(url, allowed_netlocs, excluded_extensions, document_extensions):
+    """Clean and classify an absolute URL, returning (cleaned_url, is_document)
+    
+    Cached because the same navigation and footer links recur on every page.
+    """
+    # Split once; the fragment is dropped on rebuild
+    scheme, netloc, path, query = _URL_RE.match(url).groups()
+    
+    # Must be in allowed domain
+    if netloc not in allowed_netlocs:
+        return None, None
+    
+    # Get file extension from the path as it will appear in the cleaned URL
+    path = path.rstrip('/')
+    extension = path_extension(path)
+    
+    # Skip excluded extensions
+    if extension in excluded_extensions:
+        return None, None
+    
+    cleaned_url = f'{scheme}://{netloc}{path}'
+    if query:
+        cleaned_url += '?' + query
+    return cleaned_url, extension in document_extensions
+
+# Small on purpose: only repeated nav/footer document links need the cache, and keeping
+# every document URL here would undo the memory saving of the Bloom filter seen-set
+@lru_cache(maxsize=4096)
+def dedupe_key(url):
+    """Canonical form of a URL for seen-set checks only, never for requests
+    
+    Sorts the query and normalizes percent-encoding so equivalent links share
+    one key; the server may not treat the canonical URL the same way.
+    """
+    return canonicalize_url(url, keep_fragments=False).rstrip('/')
+
+def skip_href_pattern(excluded_extensions):
+    """Compile a regex matching hrefs that can never be crawled
+    
+    Covers in-page anchors, non-HTTP schemes, and paths ending in an
+    excluded extension (the query and fragment are not inspected).
+    """
+    return re.compile(
+        r'(?:#|javascript:|mailto:|tel:|data:|blob:)'
+        r'|[^?#]*\.(?:' + '|'.join(map(re.escape, sorted(excluded_extensions))) + r')(?:[?#]|$)',
+        re.IGNORECASE
+    )
+
+def filter_links(base_url, hrefs, skip_href_re, allowed_netlocs, excluded_extensions, document_extensions):
+    """Resolve, clean and classify the hrefs found on one page
+    
+    Returns a list of (cleaned_url, is_document) for links inside the allowed
+    domains that are not excluded assets.
+    """
+    # scheme://netloc prefix for resolving root-relative links
+    scheme, netloc = _URL_RE.match(base_url).group(1, 2)
+    base_origin = f'{scheme}://{netloc}'
+    
+    # Bind hot-loop lookups to locals
+    skip = skip_href_re.match
+    links = []
+    append = links.append
+    # Navigation bars repeat the same hrefs; handle each one once per page
+    seen_on_page = set()
+    seen = seen_on_page.add
+    
+    for href in hrefs:
+        if not href:
+            continue
+        href = href.strip()
+        if href in seen_on_page:
+            continue
+        seen(href)
+        
+        # Drop anchors, non-HTTP schemes and asset links before resolving them
+        if skip(href):
+            continue
+        
+        # Convert relative URLs to absolute; the classification itself is cached per URL
+        cleaned_url, is_document = classify_url(
+            fast_join(base_url, base_origin, href),
+            allowed_netlocs,
+            excluded_extensions,
+            document_extensions
+        )
+        if cleaned_url:
+            append((cleaned_url, is_document))
+    
+    return links
@@ -0,0 +1,38 @@
+# File: crawler/middlewares.py
+
+from scrapy.exceptions import IgnoreRequest
+
+
+class NotHtmlResponse(IgnoreRequest):
+    """Raised for successful responses that are not HTML"""
+
+    def __init__(self, response, content_type):
+        super().__init__(f"non-html: {content_type}")
+        self.response = response
+        self.content_type = content_type
+
+
+class HtmlOnlyMiddleware:
+    """Drop non-HTML responses before they are decompressed, cached or parsed
+
+    The request errback receives a NotHtmlResponse failure carrying the
+    response and its content type.
+    """
+
+    html_content_types = frozenset({'text/html', 'application/xhtml+xml'})
+
+    def process_response(self, request, response, spider):
+        # Leave redirects and error statuses to the other middlewares
+        if not 200 <= response.status < 300:
+            return response
+
+        # Internal requests (robots.txt and other callback-less fetches) are not pages to parse
+        if request.meta.get('dont_obey_robotstxt') or request.callback is None:
+            return response
+
+        content_type = response.headers.get(b'Content-Type', b'').decode('latin-1')
+        content_type = content_type.split(';', 1)[0].strip().lower()
+        if content_type and content_type not in self.html_content_types:
+            raise NotHtmlResponse(response, content_type)
+
+        return response
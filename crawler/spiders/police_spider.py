@@ -1,120 +1,127 @@
 # File: kerala_police_crawler/spiders/police_spider.py
 
 import scrapy
-from urllib.parse import urljoin, urlparse
-import re
+from scrapy import signals
+from lxml import etree
+from crawler.bloom import ScalableBloomFilter
+from crawler.constants import DOCUMENT_EXTENSIONS, EXCLUDED_EXTENSIONS
+from crawler.items import UrlItem
+from crawler.jobdir import is_resuming
+from crawler.linkfilter import dedupe_key, filter_links, skip_href_pattern
 
 class PoliceSpider(scrapy.Spider):
     name = 'kerala_police'
     allowed_domains = ['keralapolice.gov.in']
     start_urls = ['https://keralapolice.gov.in/']
     
-    # File extensions to exclude (images, scripts, styles)
-    excluded_extensions = {
-        # Images
-        'jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp', 'svg', 'ico',
-        # Scripts and styles  
-        'js', 'css',
-        # Other assets we might want to skip
-        'woff', 'woff2', 'ttf', 'eot', 'otf'
+    # Resuming is opt-in: run with -s JOBDIR=crawls/kerala_police-1 to persist the scheduler
+    # queue, request dupefilter and spider state, and rerun with the same JOBDIR to resume
+    custom_settings = {
+        # Append page items to urls.jsonl in orjson-encoded batches; the pipeline disables
+        # itself if a -o/-O feed targets the same file
+        'ITEM_PIPELINES': {
+            'crawler.pipelines.BatchJsonPipeline': 300,
+        },
+        'BATCH_JSON_FILE': 'urls.jsonl',
+        'BATCH_JSON_SIZE': 1000,
+        # Document links are appended here, one URL per line, instead of going through the pipeline
+        'DOCUMENTS_FILE': 'documents.txt',
     }
     
+    # File extensions to exclude (images, scripts, styles)
+    excluded_extensions = EXCLUDED_EXTENSIONS
+    
     # File extensions to specifically include (documents)
-    document_extensions = {
-        'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx',
-        'txt', 'csv', 'xml', 'json', 'zip', 'rar'
-    }
+    document_extensions = DOCUMENT_EXTENSIONS
     
-    def __init__(self):
-        self.found_urls = set()
-        
-    def parse(self, response):
-        # Add current URL to found URLs
-        current_url = response.url
-        self.found_urls.add(current_url)
-        
-        # Yield current URL
-        yield {
-            'url': current_url,
-            'status_code': response.status,
-            'content_type': response.headers.get('Content-Type', b'').decode('utf-8'),
-            'title': response.css('title::text').get(),
-            'depth': response.meta.get('depth', 0)
-        }
-        
-        # Extract all links from <a> tags
-        links = response.css('a::attr(href)').getall()
+    # Compiled once and run directly on the lxml tree (no CSS-to-XPath translation per page)
+    _HREF_XPATH = etree.XPath('//a/@href', smart_strings=False)
+    _TITLE_XPATH = etree.XPath('string(//title)', smart_strings=False)
+    
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        # Opt-in (-s HTTP2_ENABLED=True): multiplex the single host's requests over one HTTP/2
+        # connection. Scrapy's handler is experimental and fails if TLS does not negotiate h2
+        if settings.getbool('HTTP2_ENABLED'):
+            settings.set('DOWNLOAD_HANDLERS', {
+                'https': 'scrapy.core.downloader.handlers.http2.H2DownloadHandler',
+            }, priority='spider')
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Replaced by the dict persisted in JOBDIR (if set) when the SpiderState extension opens the spider
+        self.state = {}
+        self.allowed_netlocs = frozenset(self.allowed_domains)
+        self._skip_href_re = skip_href_pattern(self.excluded_extensions)
+        self._doc_file = None
         
-        for link in links:
-            if link:
-                # Convert relative URLs to absolute
-                absolute_url = urljoin(response.url, link.strip())
-                
-                # Clean URL (remove fragments and some query params)
-                cleaned_url = self.clean_url(absolute_url)
-                
-                # Check if URL is valid and should be followed
-                if self.should_follow_url(cleaned_url):
-                    if cleaned_url not in self.found_urls:
-                        # Check if it's a document or a page to crawl
-                        if self.is_document_url(cleaned_url):
-                            # For documents, just yield the URL info without following
-                            self.found_urls.add(cleaned_url)
-                            yield {
-                                'url': cleaned_url,
-                                'status_code': 'document',
-                                'content_type': 'document',
-                                'title': 'Document Link',
-                                'depth': response.meta.get('depth', 0) + 1
-                            }
-                        else:
-                            # For regular pages, follow the link
-                            yield response.follow(
-                                cleaned_url, 
-                                callback=self.parse,
-                                dont_filter=False
-                            )
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_opened, signal=signals.spider_opened)
+        return spider
+    
+    def spider_opened(self, spider):
+        """Open the document list; a resumed crawl extends it, a fresh one replaces it"""
+        mode = 'ab' if is_resuming(self.settings) else 'wb'
+        self._doc_file = open(self.settings.get('DOCUMENTS_FILE', 'documents.txt'), mode, buffering=1 << 20)
     
-    def clean_url(self, url):
-        """Clean URL by removing fragments and unnecessary query parameters"""
-        # Remove fragment (everything after #)
-        if '#' in url:
-            url = url.split('#')[0]
+    def closed(self, reason):
+        if self._doc_file is not None:
+            self._doc_file.close()
+            self._doc_file = None
         
-        # Remove common tracking parameters
-        parsed = urlparse(url)
-        # For now, keep all query parameters, but you can filter specific ones if needed
+    @property
+    def found_urls(self):
+        """Document URLs already recorded
         
-        return url.rstrip('/')
+        Document links are written to DOCUMENTS_FILE, not requested, so the dupefilter never
+        sees them. A Bloom filter keeps the seen-set at a few bytes per URL and grows
+        past its initial capacity without losing its error rate. It lives in the
+        spider state, so with JOBDIR set it is saved and restored on resume.
+        """
+        found_urls = self.state.get('found_urls')
+        if found_urls is None:
+            found_urls = self.state['found_urls'] = ScalableBloomFilter(initial_capacity=100000, error_rate=1e-3)
+        return found_urls
     
-    def should_follow_url(self, url):
-        """Check if URL should be followed based on domain and file type"""
-        parsed = urlparse(url)
-        
-        # Must be in allowed domain
-        if parsed.netloc not in self.allowed_domains:
-            return False
+    def parse(self, response):
+        current_url = response.url
+        root = response.selector.root
+        depth = response.meta.get('depth', 0)
         
-        # Get file extension
-        path = parsed.path.lower()
-        if '.' in path:
-            extension = path.split('.')[-1].split('?')[0]  # Remove query params
-            
-            # Skip excluded extensions
-            if extension in self.excluded_extensions:
-                return False
+        # Yield current URL
+        yield UrlItem(
+            url=current_url,
+            status_code=response.status,
+            content_type=response.headers.get('Content-Type', b'').decode('utf-8'),
+            title=self._TITLE_XPATH(root) or None,
+            depth=depth
+        )
         
-        return True
-    
-    def is_document_url(self, url):
-        """Check if URL points to a document file"""
-        parsed = urlparse(url)
-        path = parsed.path.lower()
+        # Extract all links from <a> tags, then resolve, clean and classify them in one pass
+        links = filter_links(
+            current_url,
+            self._HREF_XPATH(root),
+            self._skip_href_re,
+            self.allowed_netlocs,
+            self.excluded_extensions,
+            self.document_extensions
+        )
         
-        if '.' in path:
-            extension = path.split('.')[-1].split('?')[0]  # Remove query params
-            return extension in self.document_extensions
+        # Bind the seen-set insert and the document write once; found_urls is a property backed by the spider state
+        add_found = self.found_urls.add
+        write_document = self._doc_file.write
         
-        return False
-
-
+        for cleaned_url, is_document in links:
+            # Check if it's a document or a page to crawl
+            if is_document:
+                # For documents, just record the URL (once) without following;
+                # equivalent links share one canonical key, and add() reports whether it was seen
+                if not add_found(dedupe_key(cleaned_url)):
+                    write_document(f'{cleaned_url}\n'.encode('utf-8'))
+            else:
+                # For regular pages, follow the link; Scrapy's dupefilter drops repeats.
+                # The URL is already absolute, so skip response.follow's second urljoin
+                yield scrapy.Request(cleaned_url, callback=self.parse, encoding=response.encoding)
@@ -1,123 +1,148 @@
 # File: crawler/spiders/text_content_spider.py
 
 import scrapy
-import json
+import orjson
 import os
 from urllib.parse import urlparse
 import re
 from datetime import datetime
+from lxml import etree, html
+from lxml.cssselect import CSSSelector
+from twisted.internet.threads import deferToThread
+from crawler.constants import DOCUMENT_EXTENSIONS, EXCLUDED_SELECTORS
+from crawler.items import ContentItem
+from crawler.linkfilter import path_extension
+from crawler.middlewares import NotHtmlResponse
+
+# Collapses runs of whitespace inside text fragments
+_WS_RE = re.compile(r'\s+')
+
+
+def _trie_pattern(words):
+    """Build a regex matching any of the words, with alternatives merged by common prefix
+    
+    A plain alternation retries every word at each text position; the merged form
+    lets the regex engine follow a single branch per character, like an
+    Aho-Corasick trie walk.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def to_pattern(node):
+        # A completed word already matches, so longer words sharing its prefix are redundant
+        if '' in node:
+            return ''
+        branches = [re.escape(char) + to_pattern(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    
+    return to_pattern(trie)
+
+# Very common navigation phrases, matched as substrings of lowercased text
+_NAV_PATTERNS = (
+    'skip to content',
+    'skip to main content',
+    'skip navigation',
+    'home',
+    'contact us',
+    'about us',
+    'privacy policy',
+    'terms of service',
+    'sitemap',
+    'back to top',
+    'print page',
+    'email page',
+    'share this page',
+    'follow us',
+    'copyright',
+    '©',
+    'all rights reserved',
+    'powered by',
+    'website by',
+    'designed by',
+)
+_NAV_RE = re.compile(_trie_pattern(_NAV_PATTERNS))
+
+# Shared HTML parser; bodies are handed over as UTF-8 (as parsel does) so lxml never guesses the charset
+_HTML_PARSER = html.HTMLParser(encoding='utf-8')
+
+# Inline-styled elements that are never rendered
+_HIDDEN_MATCHER = CSSSelector(
+    '[style*="display: none"], [style*="display:none"], '
+    '[style*="visibility: hidden"], [style*="visibility:hidden"]',
+    translator='html'
+)
+
+# Tags whose content is never visible (header/footer/nav/aside are covered by the excluded selectors)
+_INVISIBLE_TAGS = ('script', 'style')
 
 class TextContentSpider(scrapy.Spider):
     name = 'text_content'
     
-    # Document extensions to skip
-    document_extensions = {
-        'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx',
-        'txt', 'csv', 'zip', 'rar', 'tar', 'gz'
+    # Broad-crawl profile: the URL list spans arbitrary hosts, so favour throughput
+    custom_settings = {
+        'CONCURRENT_REQUESTS': 256,
+        'RETRY_TIMES': 1,
+        # Spread the queue across download slots instead of draining one domain at a time
+        'SCHEDULER_PRIORITY_QUEUE': 'scrapy.pqueues.DownloaderAwarePriorityQueue',
+        # Reject non-HTML responses before decompression, caching and parsing
+        'DOWNLOADER_MIDDLEWARES': {
+            'crawler.middlewares.HtmlOnlyMiddleware': 950,
+        },
+        # Results are exported as gzipped JSON lines to the output_file spider argument
+        'FEEDS': {
+            '%(output_file)s': {
+                'format': 'jsonlines',
+                'encoding': 'utf8',
+                'postprocessing': ['scrapy.extensions.postprocessing.GzipPlugin'],
+                # Replace the previous run's results, matching the summary file
+                'overwrite': True,
+            },
+        },
     }
     
+    # Document extensions to skip
+    document_extensions = DOCUMENT_EXTENSIONS
+    
     # CSS selectors for elements to exclude (headers, footers, navigation, etc.)
-    excluded_selectors = [
-        # Semantic HTML5 tags
-        'header',
-        'footer', 
-        'nav',
-        'aside',
-        
-        # Common class patterns
-        '.header',
-        '.footer',
-        '.navigation',
-        '.nav',
-        '.navbar',
-        '.sidebar',
-        '.breadcrumb',
-        '.breadcrumbs',
-        '.menu',
-        '.main-menu',
-        '.top-menu',
-        '.bottom-menu',
-        '.copyright',
-        '.social',
-        '.social-media',
-        '.social-links',
-        
-        # Common ID patterns
-        '#header',
-        '#footer',
-        '#navigation', 
-        '#nav',
-        '#navbar',
-        '#sidebar',
-        '#menu',
-        '#top-menu',
-        '#bottom-menu',
-        
-        # Skip/advertisement areas
-        '.skip',
-        '.skip-link',
-        '.skip-content',
-        '.advertisement',
-        '.ads',
-        '.ad-banner',
-        '.banner',
-        '.promo',
-        '.popup',
-        '.modal',
-        '.overlay',
-        
-        # Cookie/privacy notices
-        '.cookie-notice',
-        '.cookie-banner',
-        '.privacy-notice',
-        '.gdpr-notice',
-        
-        # Search and login areas (often in headers)
-        '.search',
-        '.search-form',
-        '.search-box',
-        '.login',
-        '.login-form',
-        '.user-menu',
-        
-        # Language/accessibility controls
-        '.language-selector',
-        '.lang-selector',
-        '.accessibility-controls',
-        '.text-size-controls',
-        
-        # Social sharing (often in footers)
-        '.share',
-        '.sharing',
-        '.social-share',
-        
-        # Back to top links
-        '.back-to-top',
-        '.scroll-to-top',
-        
-        # Print/email controls
-        '.print',
-        '.email',
-        '.print-page',
-        '.email-page'
-    ]
+    excluded_selectors = EXCLUDED_SELECTORS
     
-    def __init__(self, urls_file='urls.json', output_file='content.json', **kwargs):
+    # All excluded selectors grouped into one compiled selector (one XPath evaluation per page)
+    _excluded_matcher = CSSSelector(', '.join(excluded_selectors), translator='html')
+    
+    def __init__(self, urls_file='urls.jsonl', output_file='content.jsonl.gz',
+                 summary_file='content.summary.json', **kwargs):
         super().__init__(**kwargs)
         self.urls_file = urls_file
         self.output_file = output_file
-        self.results = []
+        self.summary_file = summary_file
+        
+        # Document URLs are never requested, so they are listed in the summary instead of the feed
+        self.skipped_documents = []
         
         # Allow custom excluded selectors via command line
         if 'excluded_selectors' in kwargs:
-            custom_selectors = kwargs['excluded_selectors'].split(',')
-            self.excluded_selectors.extend([s.strip() for s in custom_selectors])
-        
+            custom_selectors = [s.strip() for s in kwargs['excluded_selectors'].split(',') if s.strip()]
+            self.excluded_selectors = type(self).excluded_selectors + tuple(custom_selectors)
+            # Recompile the grouped selector to include the custom additions
+            self._excluded_matcher = CSSSelector(', '.join(self.excluded_selectors), translator='html')
+        
+    async def start(self):
+        """Scrapy 2.13+ entry point; newer releases no longer fall back to start_requests"""
+        for request in self.start_requests():
+            yield request
+    
     def start_requests(self):
-        """Read URLs from JSON file and create requests"""
+        """Read URLs from JSON or JSON lines file and create requests"""
         try:
-            with open(self.urls_file, 'r', encoding='utf-8') as f:
-                urls_data = json.load(f)
+            with open(self.urls_file, 'rb') as f:
+                if self.urls_file.endswith('.jsonl'):
+                    urls_data = self.read_json_lines(f)
+                else:
+                    urls_data = orjson.loads(f.read())
             
             # Handle different JSON structures
             if isinstance(urls_data, list):
@@ -139,34 +164,31 @@ class TextContentSpider(scrapy.Spider):
                     )
                 elif url:
                     # Log skipped URLs (document files)
-                    self.results.append({
-                        'url': url,
-                        'title': None,
-                        'text_content': None,
-                        'content_type': 'document (skipped)',
-                        'error': 'skipped_document',
-                        'status_code': None,
-                        'word_count': 0,
-                        'excluded_elements_count': 0,
-                        'extracted_at': datetime.now().isoformat()
-                    })
+                    self.skipped_documents.append(url)
+                    self.crawler.stats.inc_value('text_content/skipped_documents')
                     
         except FileNotFoundError:
             self.logger.error(f"URLs file {self.urls_file} not found")
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             self.logger.error(f"Invalid JSON in {self.urls_file}")
     
+    def read_json_lines(self, f):
+        """Decode one JSON value per line, skipping lines cut short by an interrupted crawl"""
+        items = []
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                self.logger.warning(f"Skipping invalid JSON on line {line_number} of {self.urls_file}")
+        return items
+    
     def should_process_url(self, url):
         """Check if URL should be processed (not a document)"""
-        parsed = urlparse(url)
-        path = parsed.path.lower()
-        
-        if '.' in path:
-            extension = path.split('.')[-1].split('?')[0]  # Remove query params
-            if extension in self.document_extensions:
-                return False
-        
-        return True
+        # The parsed path never contains the query string
+        extension = path_extension(urlparse(url).path.rstrip('/'))
+        return extension not in self.document_extensions
     
     def parse(self, response):
         """Extract text content from HTML pages"""
@@ -175,132 +197,81 @@ class TextContentSpider(scrapy.Spider):
         # Check content type
         content_type = response.headers.get('Content-Type', b'').decode('utf-8').lower()
         
-        # Only process HTML content
+        # Only process HTML content (HtmlOnlyMiddleware normally rejects the rest earlier)
         if 'text/html' not in content_type and 'application/xhtml' not in content_type:
-            result = {
-                'url': url,
-                'title': None,
-                'text_content': None,
-                'content_type': content_type,
-                'error': 'not_html_content',
-                'status_code': response.status,
-                'word_count': 0,
-                'excluded_elements_count': 0,
-                'extracted_at': datetime.now().isoformat()
-            }
+            result = self.not_html_result(url, response.status, content_type)
         else:
+            # Parse the page once and reuse the tree for the title and the text
+            root = self.parse_html(response)
+            
             # Extract title
-            title = response.css('title::text').get()
+            title = root.findtext('.//title') or None
             if title:
                 title = title.strip()
             
             # Extract all visible text (excluding headers/footers)
-            text_content, excluded_count = self.extract_visible_text(response)
+            text_content, excluded_count = self.extract_visible_text(root)
             
             # Calculate word count
             word_count = len(text_content.split()) if text_content else 0
             
-            result = {
-                'url': url,
-                'title': title,
-                'text_content': text_content,
-                'content_type': content_type,
-                'error': 'none',
-                'status_code': response.status,
-                'word_count': word_count,
-                'excluded_elements_count': excluded_count,
-                'extracted_at': datetime.now().isoformat()
-            }
-        
-        self.results.append(result)
+            result = ContentItem(
+                url=url,
+                title=title,
+                text_content=text_content,
+                content_type=content_type,
+                error='none',
+                status_code=response.status,
+                word_count=word_count,
+                excluded_elements_count=excluded_count,
+                extracted_at=datetime.now().isoformat()
+            )
+        
+        self.record_result(result)
         return result
     
-    def extract_visible_text(self, response):
-        """Extract all visible text from the page, excluding headers/footers"""
-        # Create a copy of the response selector to avoid modifying the original
-        selector = response
-        
+    def parse_html(self, response):
+        """Parse the response into an lxml tree without building a parsel selector"""
+        try:
+            return html.document_fromstring(response.text.encode('utf-8'), parser=_HTML_PARSER)
+        except etree.ParserError:
+            # Empty document
+            return html.Element('html')
+    
+    def extract_visible_text(self, root):
+        """Extract all visible text from the page tree, excluding headers/footers"""
         # Count excluded elements for statistics
-        excluded_count = 0
+        excluded = self._excluded_matcher(root)
+        excluded_count = len(excluded)
         
-        # Remove excluded elements first
-        for css_selector in self.excluded_selectors:
-            try:
-                elements = selector.css(css_selector)
-                excluded_count += len(elements)
-                # Remove each matching element
-                for element in elements:
-                    element.remove()
-            except Exception as e:
-                # Log but don't fail if a selector doesn't work
-                self.logger.debug(f"Selector '{css_selector}' failed: {e}")
-                continue
-        
-        # Remove script and style elements (if any remain)
-        for script in selector.css('script'):
-            script.remove()
-        for style in selector.css('style'):
-            style.remove()
+        # Remove excluded and hidden elements, keeping the text that follows them
+        for element in excluded + _HIDDEN_MATCHER(root):
+            if element.getparent() is not None:
+                element.drop_tree()
         
-        # Also remove comments and other non-visible elements
-        for comment in selector.css('*[style*="display: none"], *[style*="display:none"]'):
-            comment.remove()
-        for hidden in selector.css('*[style*="visibility: hidden"], *[style*="visibility:hidden"]'):
-            hidden.remove()
+        # Strip script and style elements (keeping their tail text) in C
+        etree.strip_elements(root, *_INVISIBLE_TAGS, with_tail=False)
         
-        # Get all remaining text content
-        text_elements = selector.css('*::text').getall()
+        # Strip the remaining text nodes (in document order); after stripping, a length
+        # above one also rules out empty and whitespace-only text
+        stripped = map(str.strip, root.itertext())
         
-        # Clean and filter text
-        cleaned_text = []
-        for text in text_elements:
-            text = text.strip()
-            # Skip empty text, whitespace-only text, and very short text snippets
-            if text and not text.isspace() and len(text) > 1:
-                # Skip common navigation text patterns
-                if not self.is_navigation_text(text):
-                    cleaned_text.append(text)
+        # Skip very short text snippets and common navigation text patterns
+        kept = (text for text in stripped if len(text) > 1 and not self.is_navigation_text(text))
         
-        # Join with spaces and clean up extra whitespace
-        full_text = ' '.join(cleaned_text)
-        # Replace multiple spaces/newlines with single space
-        full_text = re.sub(r'\s+', ' ', full_text)
+        # Replace inner runs of spaces/newlines with a single space and join the chunks
+        full_text = ' '.join(_WS_RE.sub(' ', text) for text in kept)
         
-        return full_text.strip(), excluded_count
+        return full_text, excluded_count
     
     def is_navigation_text(self, text):
         """Check if text appears to be navigation-related"""
         # Convert to lowercase for comparison
         text_lower = text.lower().strip()
         
-        # Skip very common navigation phrases
-        nav_patterns = [
-            'skip to content',
-            'skip to main content',
-            'skip navigation',
-            'home',
-            'contact us',
-            'about us',
-            'privacy policy',
-            'terms of service',
-            'sitemap',
-            'back to top',
-            'print page',
-            'email page',
-            'share this page',
-            'follow us',
-            'copyright',
-            '©',
-            'all rights reserved',
-            'powered by',
-            'website by',
-            'designed by'
-        ]
-        
         # Skip if text matches navigation patterns
-        for pattern in nav_patterns:
-            if pattern in text_lower:
-                return True
+        if _NAV_RE.search(text_lower):
+            return True
         
         # Skip if text is just a single character or symbol
         if len(text_lower) == 1 and not text_lower.isalnum():
@@ -316,6 +287,12 @@ class TextContentSpider(scrapy.Spider):
         """Handle request errors"""
         url = failure.request.meta.get('original_url', failure.request.url)
         
+        # Non-HTML responses dropped by HtmlOnlyMiddleware are not errors
+        if failure.check(NotHtmlResponse):
+            result = self.not_html_result(url, failure.value.response.status, failure.value.content_type)
+            self.record_result(result)
+            return result
+        
         # Extract error information
         if hasattr(failure.value, 'response') and failure.value.response:
             status_code = failure.value.response.status
@@ -324,74 +301,108 @@ class TextContentSpider(scrapy.Spider):
             status_code = None
             error = str(failure.value)
         
-        result = {
-            'url': url,
-            'title': None,
-            'text_content': None,
-            'content_type': None,
-            'error': error,
-            'status_code': status_code,
-            'word_count': 0,
-            'excluded_elements_count': 0,
-            'extracted_at': datetime.now().isoformat()
-        }
-        
-        self.results.append(result)
+        result = ContentItem(
+            url=url,
+            title=None,
+            text_content=None,
+            content_type=None,
+            error=error,
+            status_code=status_code,
+            word_count=0,
+            excluded_elements_count=0,
+            extracted_at=datetime.now().isoformat()
+        )
+        
+        self.record_result(result)
         self.logger.error(f"Error processing {url}: {error}")
         
         return result
     
+    def not_html_result(self, url, status_code, content_type):
+        """Build the result for a response that is not HTML"""
+        return ContentItem(
+            url=url,
+            title=None,
+            text_content=None,
+            content_type=content_type,
+            error='not_html_content',
+            status_code=status_code,
+            word_count=0,
+            excluded_elements_count=0,
+            extracted_at=datetime.now().isoformat()
+        )
+    
+    def record_result(self, result):
+        """Update the summary counters in the crawler stats"""
+        stats = self.crawler.stats
+        stats.inc_value('text_content/results')
+        error = result['error']
+        if error == 'none':
+            stats.inc_value('text_content/successful')
+            stats.inc_value('text_content/words', result['word_count'])
+            stats.inc_value('text_content/excluded_elements', result['excluded_elements_count'])
+        else:
+            stats.inc_value('text_content/errors')
+            if error == 'not_html_content':
+                stats.inc_value('text_content/not_html')
+    
     def closed(self, reason):
-        """Save results to JSON file when spider closes"""
+        """Write the summary file from the collected stats when spider closes"""
+        stats = self.crawler.stats
+        successful = stats.get_value('text_content/successful', 0)
+        errors = stats.get_value('text_content/errors', 0)
+        skipped_documents = stats.get_value('text_content/skipped_documents', 0)
+        not_html = stats.get_value('text_content/not_html', 0)
+        total_urls = stats.get_value('text_content/results', 0) + skipped_documents
+        
+        # Calculate content statistics
+        total_words = stats.get_value('text_content/words', 0)
+        total_excluded_elements = stats.get_value('text_content/excluded_elements', 0)
+        avg_words_per_page = total_words / successful if successful > 0 else 0
+        avg_excluded_per_page = total_excluded_elements / successful if successful > 0 else 0
+        
+        # Create summary object
+        summary = {
+            'total_urls_processed': total_urls,
+            'successful_extractions': successful,
+            'errors': errors,
+            'skipped_documents': skipped_documents,
+            'not_html_content': not_html,
+            'total_words_extracted': total_words,
+            'total_excluded_elements': total_excluded_elements,
+            'avg_words_per_page': round(avg_words_per_page, 1),
+            'avg_excluded_elements_per_page': round(avg_excluded_per_page, 1),
+            'processing_completed_at': datetime.now().isoformat(),
+            'success_rate': f"{(successful/total_urls*100):.1f}%" if total_urls > 0 else "0.0%"
+        }
+        
+        # Results go to the feed; the summary file carries settings, totals and skipped documents
+        output_data = {
+            'extraction_settings': {
+                'excluded_selectors': self.excluded_selectors,
+                'document_extensions_skipped': list(self.document_extensions)
+            },
+            'results_file': self.output_file,
+            'skipped_documents': self.skipped_documents,
+            'summary': summary
+        }
+        
+        # Print detailed summary
+        self.logger.info(f"Summary: {successful} successful, {errors} errors, {skipped_documents} skipped documents")
+        self.logger.info(f"Content stats: {total_words} total words, {total_excluded_elements} elements excluded")
+        self.logger.info(f"Averages: {avg_words_per_page:.1f} words/page, {avg_excluded_per_page:.1f} excluded elements/page")
+        self.logger.info(f"Success rate: {summary['success_rate']}")
+        
+        # Write the summary off the reactor thread
+        return deferToThread(self._write_summary, output_data)
+    
+    def _write_summary(self, output_data):
+        """Write the summary file (runs in the reactor thread pool)"""
         try:
-            # Calculate summary statistics
-            total_urls = len(self.results)
-            successful = len([r for r in self.results if r['error'] == 'none'])
-            errors = len([r for r in self.results if r['error'] not in ['none', 'skipped_document']])
-            skipped_documents = len([r for r in self.results if r['error'] == 'skipped_document'])
-            not_html = len([r for r in self.results if r['error'] == 'not_html_content'])
-            
-            # Calculate content statistics
-            total_words = sum(r['word_count'] for r in self.results if r['word_count'])
-            total_excluded_elements = sum(r['excluded_elements_count'] for r in self.results if r['excluded_elements_count'])
-            avg_words_per_page = total_words / successful if successful > 0 else 0
-            avg_excluded_per_page = total_excluded_elements / successful if successful > 0 else 0
-            
-            # Create summary object
-            summary = {
-                'total_urls_processed': total_urls,
-                'successful_extractions': successful,
-                'errors': errors,
-                'skipped_documents': skipped_documents,
-                'not_html_content': not_html,
-                'total_words_extracted': total_words,
-                'total_excluded_elements': total_excluded_elements,
-                'avg_words_per_page': round(avg_words_per_page, 1),
-                'avg_excluded_elements_per_page': round(avg_excluded_per_page, 1),
-                'processing_completed_at': datetime.now().isoformat(),
-                'success_rate': f"{(successful/total_urls*100):.1f}%" if total_urls > 0 else "0.0%"
-            }
-            
-            # Structure final output with results and summary
-            output_data = {
-                'extraction_settings': {
-                    'excluded_selectors': self.excluded_selectors,
-                    'document_extensions_skipped': list(self.document_extensions)
-                },
-                'results': self.results,
-                'summary': summary
-            }
-            
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
-            
-            self.logger.info(f"Saved {total_urls} results to {self.output_file}")
+            with open(self.summary_file, 'wb') as f:
+                f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
             
-            # Print detailed summary
-            self.logger.info(f"Summary: {successful} successful, {errors} errors, {skipped_documents} skipped documents")
-            self.logger.info(f"Content stats: {total_words} total words, {total_excluded_elements} elements excluded")
-            self.logger.info(f"Averages: {avg_words_per_page:.1f} words/page, {avg_excluded_per_page:.1f} excluded elements/page")
-            self.logger.info(f"Success rate: {summary['success_rate']}")
+            self.logger.info(f"Saved summary of {output_data['summary']['total_urls_processed']} URLs to {self.summary_file}")
             
         except Exception as e:
-            self.logger.error(f"Error saving results: {e}")
\ No newline at end of file
+            self.logger.error(f"Error saving summary: {e}")
@@ -0,0 +1,52 @@
+# File: tests/test_bloom.py
+
+import pickle
+
+from crawler.bloom import BloomFilter, ScalableBloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=1e-3)
+    keys = [f'https://keralapolice.gov.in/doc/{i}.pdf' for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert len(bloom) <= 1000
+
+
+def test_add_reports_existing_keys():
+    bloom = ScalableBloomFilter(initial_capacity=100)
+    assert bloom.add('https://keralapolice.gov.in/a.pdf') is False
+    assert bloom.add('https://keralapolice.gov.in/a.pdf') is True
+    assert len(bloom) == 1
+
+
+def test_scalable_filter_grows_without_false_negatives():
+    bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=1e-2)
+    keys = [f'https://keralapolice.gov.in/doc/{i}.pdf' for i in range(30000)]
+    for key in keys:
+        bloom.add(key)
+    assert len(bloom.filters) > 1
+    assert all(key in bloom for key in keys)
+
+
+def test_scalable_filter_false_positive_rate_stays_within_error_rate():
+    error_rate = 1e-2
+    bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=error_rate)
+    for i in range(30000):
+        bloom.add(f'https://keralapolice.gov.in/doc/{i}.pdf')
+    assert len(bloom.filters) > 1
+
+    probes = 50000
+    false_positives = sum(f'https://keralapolice.gov.in/other/{i}.pdf' in bloom for i in range(probes))
+    assert false_positives / probes <= error_rate
+
+
+def test_scalable_filter_survives_pickling():
+    # Spider state is pickled to JOBDIR between runs
+    bloom = ScalableBloomFilter(initial_capacity=100)
+    for i in range(500):
+        bloom.add(f'https://keralapolice.gov.in/doc/{i}.pdf')
+    restored = pickle.loads(pickle.dumps(bloom))
+    assert all(f'https://keralapolice.gov.in/doc/{i}.pdf' in restored for i in range(500))
+    assert len(restored) == len(bloom)
@@ -0,0 +1,82 @@
+# File: tests/test_linkfilter.py
+
+from urllib.parse import urljoin, urlparse
+
+import pytest
+
+pytest.importorskip('w3lib')
+
+from crawler.constants import DOCUMENT_EXTENSIONS, EXCLUDED_EXTENSIONS
+from crawler.linkfilter import filter_links, skip_href_pattern
+
+ALLOWED_NETLOCS = frozenset({'keralapolice.gov.in'})
+BASE_URL = 'https://keralapolice.gov.in/page/news'
+
+
+def _baseline_extension(url):
+    path = urlparse(url).path.lower()
+    return path.split('.')[-1].split('?')[0] if '.' in path else None
+
+
+def _baseline_links(base_url, hrefs):
+    """The original PoliceSpider path: urljoin, clean_url, should_follow_url, is_document_url"""
+    links = {}
+    for href in hrefs:
+        if not href:
+            continue
+        cleaned_url = urljoin(base_url, href.strip()).split('#')[0].rstrip('/')
+        if urlparse(cleaned_url).netloc not in ALLOWED_NETLOCS:
+            continue
+        extension = _baseline_extension(cleaned_url)
+        if extension in EXCLUDED_EXTENSIONS:
+            continue
+        links.setdefault(cleaned_url, extension in DOCUMENT_EXTENSIONS)
+    return list(links.items())
+
+
+def _filter(hrefs):
+    return filter_links(
+        BASE_URL,
+        hrefs,
+        skip_href_pattern(EXCLUDED_EXTENSIONS),
+        ALLOWED_NETLOCS,
+        EXCLUDED_EXTENSIONS,
+        DOCUMENT_EXTENSIONS
+    )
+
+
+@pytest.mark.parametrize('href', [
+    '/about#team',
+    'contact#form',
+    '?q=police',
+    '?page=2&sort=date',
+    '//keralapolice.gov.in/page/press',
+    '//example.com/page',
+    '/a.pdf/',
+    '/files/report.PDF',
+    '/downloads/form.docx?v=3',
+    '/images/logo.JPG?x=1',
+    '/static/site.css',
+    'https://keralapolice.gov.in/page/news/',
+    'https://example.com/outside',
+    'relative/page',
+    '../up/one',
+    ' /padded ',
+    'mailto:info@keralapolice.gov.in',
+    'javascript:void(0)',
+])
+def test_matches_baseline(href):
+    assert _filter([href]) == _baseline_links(BASE_URL, [href])
+
+
+def test_matches_baseline_for_a_whole_page():
+    hrefs = ['/', '/about', '/about', '?q', '//keralapolice.gov.in/x', '/a.pdf/', '/a.pdf',
+             '/img/a.JPG?x', 'tel:100', '', None, '/about/', 'sub/page#frag']
+    # Hrefs that differ only by a trailing slash clean to the same URL; the spider's
+    # dupefilter and document seen-set drop those repeats, as the baseline's did
+    assert list(dict.fromkeys(_filter(hrefs))) == _baseline_links(BASE_URL, hrefs)
+
+
+def test_anchors_are_dropped():
+    # The baseline resolved these to the current page, which the dupefilter then dropped
+    assert _filter(['#', '#top']) == []
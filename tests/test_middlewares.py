@@ -0,0 +1,36 @@
+# File: tests/test_middlewares.py
+
+import pytest
+
+pytest.importorskip('scrapy')
+
+from scrapy import Request, Spider
+from scrapy.http import Response
+
+from crawler.middlewares import HtmlOnlyMiddleware, NotHtmlResponse
+
+
+def _response(request, content_type):
+    return Response(request.url, status=200, headers={'Content-Type': content_type}, request=request)
+
+
+def test_robots_txt_passes_through():
+    spider = Spider('test')
+    request = Request('https://example.com/robots.txt', meta={'dont_obey_robotstxt': True})
+    response = _response(request, 'text/plain')
+    assert HtmlOnlyMiddleware().process_response(request, response, spider) is response
+
+
+def test_non_html_page_is_rejected():
+    spider = Spider('test')
+    request = Request('https://example.com/file.txt', callback=spider.parse)
+    response = _response(request, 'text/plain')
+    with pytest.raises(NotHtmlResponse):
+        HtmlOnlyMiddleware().process_response(request, response, spider)
+
+
+def test_html_page_passes_through():
+    spider = Spider('test')
+    request = Request('https://example.com/', callback=spider.parse)
+    response = _response(request, 'text/html; charset=UTF-8')
+    assert HtmlOnlyMiddleware().process_response(request, response, spider) is response
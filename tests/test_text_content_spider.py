@@ -0,0 +1,81 @@
+# File: tests/test_text_content_spider.py
+
+import random
+import re
+
+import pytest
+
+pytest.importorskip('scrapy')
+pytest.importorskip('lxml.cssselect')
+pytest.importorskip('orjson')
+
+from crawler.spiders.text_content_spider import _NAV_RE, _trie_pattern
+
+# The phrase list of the original substring loop in is_navigation_text
+BASELINE_NAV_PATTERNS = [
+    'skip to content',
+    'skip to main content',
+    'skip navigation',
+    'home',
+    'contact us',
+    'about us',
+    'privacy policy',
+    'terms of service',
+    'sitemap',
+    'back to top',
+    'print page',
+    'email page',
+    'share this page',
+    'follow us',
+    'copyright',
+    '©',
+    'all rights reserved',
+    'powered by',
+    'website by',
+    'designed by'
+]
+
+
+def _baseline_match(text_lower):
+    for pattern in BASELINE_NAV_PATTERNS:
+        if pattern in text_lower:
+            return True
+    return False
+
+
+def _random_texts(count, seed=0):
+    """Mix fragments of the phrases with noise so near misses are common"""
+    rng = random.Random(seed)
+    fragments = [p[:rng.randint(1, len(p))] for p in BASELINE_NAV_PATTERNS for _ in range(3)]
+    fragments += BASELINE_NAV_PATTERNS + ['kerala', 'police', 'station', ' ', 'to', 'us', 'by', '2024', '.']
+    for _ in range(count):
+        yield ''.join(rng.choice(fragments) for _ in range(rng.randint(1, 6)))
+
+
+@pytest.mark.parametrize('text', [
+    'home', 'homepage', 'welcome home', 'hom', 'skip to', 'skip to main', 'skip to main content',
+    'contact', 'contact us today', 'about', 'powered by kerala police', '© 2024', 'designed',
+    'police station', '',
+])
+def test_nav_re_matches_substring_loop(text):
+    assert bool(_NAV_RE.search(text)) == _baseline_match(text)
+
+
+def test_nav_re_matches_substring_loop_on_random_text():
+    for text in _random_texts(20000):
+        assert bool(_NAV_RE.search(text)) == _baseline_match(text), text
+
+
+@pytest.mark.parametrize('words', [
+    ['a', 'ab', 'abc'],
+    ['abc', 'ab', 'a'],
+    ['car', 'cart', 'care', 'dog'],
+    ['x.y', 'x*y', '(z)'],
+])
+def test_trie_pattern_matches_plain_alternation(words):
+    trie_re = re.compile(_trie_pattern(words))
+    rng = random.Random(1)
+    alphabet = ''.join(sorted(set(''.join(words)))) + 'q'
+    for _ in range(2000):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+        assert bool(trie_re.search(text)) == any(word in text for word in words), text